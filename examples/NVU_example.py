@@ -2,7 +2,6 @@
 """
 
 import gamdpy as gp
-import pandas as pd
 import numpy as np
 from numba import config
 import matplotlib.pyplot as plt
@@ -75,10 +74,8 @@ NVT_sim.run()
 
 #
 #Finding the average potential energy (= U_0) of the run.
-columns = ['U']
-data = np.array(gp.extract_scalars(NVT_sim.output, columns, first_block=8))
-df = pd.DataFrame(data.T, columns=columns)
-U_0 = np.mean(df['U'])/configuration.N
+U, = gp.extract_scalars(NVT_sim.output, ['U'], first_block=8)
+U_0 = U.mean()/configuration.N
 
 
 for i in range(2): print()
@@ -125,18 +122,17 @@ if __name__ == "__main__":
     plt.show(block=False)
 
 #Calculating the configurational temperature
-columns = ['U', 'lapU', 'Fsq', 'W']
-data = np.array(gp.extract_scalars(NVU_sim.output, columns, first_block=16))
-df = pd.DataFrame(data.T, columns=columns)
-df['Tconf'] = df['Fsq']/df['lapU']
-Tconf = np.mean(df['Tconf'],axis=0)
+U, lapU, Fsq = gp.extract_scalars(NVU_sim.output, ['U', 'lapU', 'Fsq'], first_block=16)
+Tconf = Fsq/lapU
+Tconf_mean = Tconf.mean()
 
-times = len(df['Tconf'])*128*4*dl
+times = len(Tconf)*128*4*dl
 
 
 plt.figure(figsize=(10,4))
-plt.plot(np.arange(len(df['Tconf']))*128*4*dl,np.round(df['Tconf'],2),label = r"$T_{conf}$")
+plt.plot(np.arange(len(Tconf))*128*4*dl,np.round(Tconf,2),label = r"$T_{conf}$")
 plt.plot((0,times),(temperature,temperature), label = f"Set temperature (T = {temperature})")
+plt.plot((0,times),(Tconf_mean,Tconf_mean), label = f"Mean of T_conf = {np.round(Tconf_mean,3)}")
 plt.ylabel("Temperature")
 plt.xlabel("t")
 plt.legend()
@@ -144,7 +140,7 @@ if __name__ == "__main__":
     plt.show(block=False)
 
 plt.figure(figsize=(10,4))
-plt.plot(np.arange(len(df['U']))*128*4*dl,df['U']/configuration.N, label = "U(t)")
+plt.plot(np.arange(len(U))*128*4*dl,U/configuration.N, label = "U(t)")
 plt.plot((0,times),(U_0,U_0), label = f"U_0 = {np.round(U_0,3)}")
 plt.ylabel("Potential energy")
 plt.xlabel("t")
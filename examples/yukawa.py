@@ -88,16 +88,23 @@ def yukawa(dist, params):
     return u, s, d2u_dr2  # u(r), -u'(r)/r, u''(r)
 
 
+def yukawa_np(r, kappa, A):
+    """ NumPy version of the yukawa function above, evaluated on an array of distances """
+    kr = kappa * r
+    e = A * np.exp(-kr) / r
+    return e, (kr + 1) * e / r**2, (kr * kr + 2 * kr + 2) * e / r**2  # u(r), -u'(r)/r, u''(r)
+
+
 # Plot the Yukawa potential, and confirm the analytical derivatives
 # are as expected from the numerical derivatives.
 plt.figure()
 r = np.linspace(0.8, 3, 200, dtype=np.float32)
 params = [1.0, 1.0, 2.5]
-u = [yukawa(rr, params)[0] for rr in r]
+u, s, umm = yukawa_np(r, params[0], params[1])
+# Check that the numba function gives the same as the vectorized one
+assert np.allclose(yukawa(r[0], params), (u[0], s[0], umm[0]), rtol=1e-5)
 u_check = params[1] * np.exp(-params[0] * r) / r
-s = [yukawa(rr, params)[1] for rr in r]
 s_numerical = -np.gradient(u, r) / r
-umm = [yukawa(rr, params)[2] for rr in r]
 umm_numerical = np.gradient(np.gradient(u, r), r)
 plt.plot(r, u, '-', label='u(r)')
 plt.plot(r, u_check, '--', label='u(r), check')
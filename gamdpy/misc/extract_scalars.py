@@ -1,3 +1,6 @@
+import numpy as np
+from ..runtime_actions.scalar_saver import ScalarSaver, columns_to_time_series
+
 def extract_scalars(data, column_list, first_block=0, D=3):
     """ Extracts scalar data from simulation output.
 
@@ -44,8 +47,9 @@ def extract_scalars(data, column_list, first_block=0, D=3):
     for index, name in enumerate(scalar_names):
         column_indices[name] = index
 
-    output_list = []
-    for column in column_list:
-        output_list.append(data['scalar_saver/scalars'][first_block:,:,column_indices[column]].flatten())
-    return tuple(output_list)
+    indices = [column_indices[column] for column in column_list]
+    data_array = ScalarSaver.read_columns(data, indices, first_block=first_block)
+
+    time_series = columns_to_time_series(data_array, 1, np.float32(1.0))
+    return tuple(time_series[i] for i in range(len(column_list)))
 
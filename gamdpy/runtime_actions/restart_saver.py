@@ -35,29 +35,3 @@ class RestartSaver(RuntimeAction):
 
     def update_at_end_of_timeblock(self,  timeblock: int, output_reference):
         pass
-
-    def get_prestep_kernel(self, configuration, compute_plan, verbose=False):
-        pb, tp, gridsync = [compute_plan[key] for key in ['pb', 'tp', 'gridsync']]
-        if gridsync:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-                return
-            return cuda.jit(device=gridsync)(kernel)
-        else:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-            return kernel
-
-    def get_poststep_kernel(self, configuration, compute_plan):
-        # Unpack parameters from configuration and compute_plan
-        
-        pb, tp, gridsync = [compute_plan[key] for key in ['pb', 'tp', 'gridsync']]
-        if gridsync:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-                return
-            return cuda.jit(device=gridsync)(kernel)
-        else:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-            return kernel
@@ -15,23 +15,23 @@ class RuntimeAction(ABC):
     def setup(self, configuration: Configuration, num_timeblocks: int, steps_per_timeblock: int, output, verbose=False) -> None:
         pass
 
-    @abstractmethod   
-    def get_prestep_kernel(self, configuration: Configuration, compute_plan: dict) -> Callable:
+    def get_prestep_kernel(self, configuration: Configuration, compute_plan: dict) -> Callable | None:
         """
         Get a kernel (or python function depending on compute_plan["gridsync"]) that implements the runtime_action.
         The generated kernel is called after evaluation of interactions, before intergration step is performed, see class Simulation
+        Return None (the default) if the runtime_action has nothing to do before the integration step.
         """
 
-        pass
+        return None
 
-    @abstractmethod   
-    def get_poststep_kernel(self, configuration: Configuration, compute_plan: dict) -> Callable:
+    def get_poststep_kernel(self, configuration: Configuration, compute_plan: dict) -> Callable | None:
         """
         Get a kernel (or python function depending on compute_plan["gridsync"]) that implements the runtime_action
         The generated kernel is called immediately after evaluation intergration step is performed, see class Simulation
+        Return None (the default) if the runtime_action has nothing to do after the integration step.
         """
 
-        pass
+        return None
 
     @abstractmethod
     def get_params(self, configuration: Configuration, compute_plan: dict) -> tuple :
@@ -55,43 +55,68 @@ class RuntimeAction(ABC):
 
         pass
 
-def merge_runtime_actions(configuration: Configuration, prestep_kernelA: Callable, poststep_kernelA: Callable, paramsA: tuple, actionB: RuntimeAction, compute_plan: dict) -> tuple[Callable, Callable, tuple] :
+    def finalize_after_run(self, output_reference):
+        """
+        Method to be called after the last timeblock of a run (also if the run is left early), e.g. for writing output kept on the device
+        """
+
+        pass
+
+def merge_kernels(kernelA: Callable | None, kernelB: Callable | None, gridsync: bool) -> Callable | None:
+    """ Merge two (possibly None) kernels into one, calling them with runtime_actions_params[0] and [1] respectively """
+
+    if kernelA is None and kernelB is None:
+        return None
+
+    if gridsync:
+        # A device function, calling a number of device functions, using gridsync to syncronize
+        if kernelB is None:
+            @cuda.jit(device=gridsync)
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
+                return
+        elif kernelA is None:
+            @cuda.jit(device=gridsync)
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
+                return
+        else:
+            @cuda.jit(device=gridsync)
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
+                grid.sync() # Not always necessary !!!
+                kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
+                return
+    else:
+        # A python function, making several kernel calls to syncronize
+        if kernelB is None:
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
+                return
+        elif kernelA is None:
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
+                return
+        else:
+            def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
+                kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
+                kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
+                return
+
+    return kernel
+
+def merge_runtime_actions(configuration: Configuration, prestep_kernelA: Callable | None, poststep_kernelA: Callable | None, paramsA: tuple, actionB: RuntimeAction, compute_plan: dict) -> tuple[Callable | None, Callable | None, tuple] :
     paramsB = actionB.get_params(configuration, compute_plan)
     prestep_kernelB = actionB.get_prestep_kernel(configuration, compute_plan)
     poststep_kernelB = actionB.get_poststep_kernel(configuration, compute_plan)
 
-    if compute_plan['gridsync']:
-        # A device function, calling a number of device functions, using gridsync to syncronize
-        @cuda.jit( device=compute_plan['gridsync'])
-        def prestep_kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
-            prestep_kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
-            grid.sync() # Not always necessary !!!
-            prestep_kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
-            return
-
-        @cuda.jit( device=compute_plan['gridsync'])
-        def poststep_kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
-            poststep_kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
-            grid.sync() # Not always necessary !!!
-            poststep_kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
-            return
-        
-        return prestep_kernel, poststep_kernel, (paramsA, paramsB, )
-    else:
-        # Two python function, making several kernel calls to syncronize
-        def prestep_kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
-            prestep_kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
-            prestep_kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
-            return
+    # Kernels that are None are left out, so that no (empty) calls are made for them in the inner loop
+    prestep_kernel = merge_kernels(prestep_kernelA, prestep_kernelB, compute_plan['gridsync'])
+    poststep_kernel = merge_kernels(poststep_kernelA, poststep_kernelB, compute_plan['gridsync'])
 
-        def poststep_kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params):
-            poststep_kernelA(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[0])
-            poststep_kernelB(grid, vectors, scalars, r_im, sim_box, step, runtime_actions_params[1])
-            return
-        
-        return prestep_kernel, poststep_kernel, (paramsA, paramsB, )   
+    return prestep_kernel, poststep_kernel, (paramsA, paramsB, )
 
-def add_runtime_actions_list(configuration: Configuration, runtime_actions_list: list[RuntimeAction], compute_plan: dict, verbose: bool = False) -> tuple[Callable, Callable, tuple]:
+def add_runtime_actions_list(configuration: Configuration, runtime_actions_list: list[RuntimeAction], compute_plan: dict, verbose: bool = False) -> tuple[Callable | None, Callable | None, tuple]:
 
     # Setup first interaction and cuda.jit it if gridsync is used for syncronization
     params = runtime_actions_list[0].get_params(configuration, compute_plan)
@@ -99,8 +124,10 @@ def add_runtime_actions_list(configuration: Configuration, runtime_actions_list:
     poststep_kernel = runtime_actions_list[0].get_poststep_kernel(configuration, compute_plan)
 
     if compute_plan['gridsync']:
-        prestep_kernel: Callable = cuda.jit( device=compute_plan['gridsync'] )(prestep_kernel)
-        poststep_kernel: Callable = cuda.jit( device=compute_plan['gridsync'] )(poststep_kernel)
+        if prestep_kernel is not None:
+            prestep_kernel: Callable = cuda.jit( device=compute_plan['gridsync'] )(prestep_kernel)
+        if poststep_kernel is not None:
+            poststep_kernel: Callable = cuda.jit( device=compute_plan['gridsync'] )(poststep_kernel)
 
     # Merge in the rest of the runtime_actions (maximum recursion depth might set a maximum for number of interactions)
     for i in range(1, len(runtime_actions_list)):
@@ -1,30 +1,99 @@
+import os
 import numpy as np
 import numba
 import math
-from numba import cuda, config
+from numba import cuda
+from numba.cuda.cudadrv.driver import device_memset
 import h5py
 
 from .runtime_action import RuntimeAction
 
+@cuda.jit(device=True)
+def warp_sum(value):
+    """ Sum of value over a full warp using shuffles. The result is in lane 0 """
+    for offset in (16, 8, 4, 2, 1):
+        value += cuda.shfl_down_sync(0xffffffff, value, offset)
+    return value
+
+@numba.njit(parallel=True, cache=True)
+def columns_to_time_series(data, subsample, scale):
+    """ Convert data with shape (num_timeblocks, num_columns, saves_per_block) to an array with a
+    (subsampled and scaled) time series for each column, shape (num_columns, num_rows)
+    """
+    num_timeblocks, num_columns, saves_per_block = data.shape
+    num_rows = (num_timeblocks*saves_per_block + subsample - 1)//subsample
+    output = np.empty((num_columns, num_rows), dtype=data.dtype)
+    for row in numba.prange(num_rows): # Usually many more rows than columns
+        timeblock, save = divmod(row*subsample, saves_per_block)
+        for column in range(num_columns):
+            output[column, row] = data[timeblock, column, save] / scale
+    return output
+
+def float32_to_bfloat16(array):
+    """ Round float32 values to nearest (ties to even) bfloat16, returned as the upper 16 bits in an uint16 array """
+    bits = np.ascontiguousarray(array, dtype=np.float32).view(np.uint32)
+    rounded = ((bits + np.uint32(0x7FFF) + ((bits >> 16) & np.uint32(1))) >> 16).astype(np.uint16)
+    return np.where(np.isnan(array), np.uint16(0x7FC0), rounded) # Rounding could turn some NaN's into inf
+
+def bfloat16_to_float32(array):
+    """ Convert bfloat16 values stored as uint16 (see float32_to_bfloat16) to float32, by zero-extending """
+    return (np.asarray(array, dtype=np.uint32) << 16).view(np.float32)
+
 class ScalarSaver(RuntimeAction):
     """ 
     Runtime action for saving scalar data (such as thermodynamic properties) during a timeblock
     every `steps_between_output` time steps.
+
+    The scalars of a timeblock are copied to a pinned host buffer and written to the output at the end of the timeblock,
+    so the output can be read on-the-fly when `Simulation.run_timeblocks` yields the timeblock.
+
+    Besides the compression filters of h5py (e.g. compression="gzip"), Blosc compression is available as
+    compression="blosc:<cname>", e.g. "blosc:lz4" or "blosc:zstd", with compression_opts as compression level.
+    This requires the hdf5plugin package, also when reading the data.
+
+    If the volume is saved (compute_flags['Vol']) and the simulation box is not changed by the integrator
+    (i.e. not NPT), constant_volume=True lets the volume be set from the host once per timeblock,
+    instead of being computed in the kernel at every save.
+
+    With device_resident=True the scalars of each timeblock are kept on the device (in `d_blocks`, available for further
+    processing on the GPU), and only copied to the host and written to the output by `flush`, which is called at the end of a run
+    (also if the loop over `Simulation.run_timeblocks` is left early). Reading the scalars on-the-fly is then not supported,
+    and raises a ValueError.
+
+    With storage_dtype='bfloat16' the scalars are rounded to bfloat16 (about 3 significant digits) when written,
+    halving the size of the output. The accumulation on the device is still in float32, and `extract` returns float32.
+    The default, storage_dtype='float32', keeps full precision, as needed e.g. for fluctuations of the energy.
     """
 
-    def __init__(self, steps_between_output:int = 16, compute_flags = None, verbose=False, compression="gzip", compression_opts=4) -> None:
+    # Compiled poststep kernels, shared between instances so that simulations with the same setup skip the JIT compilation
+    kernel_cache = {}
+
+    def __init__(self, steps_between_output:int = 16, compute_flags = None, verbose=False, compression="gzip", compression_opts=4, constant_volume=False, device_resident=False, storage_dtype='float32') -> None:
 
         if type(steps_between_output) != int or steps_between_output < 0:
             raise ValueError(f'steps_between_output ({steps_between_output}) should be non-negative integer.')
         self.steps_between_output = steps_between_output
 
         self.compute_flags = compute_flags
+        self.constant_volume = constant_volume
+        self.device_resident = device_resident
+        if storage_dtype not in ('float32', 'bfloat16'):
+            raise ValueError(f"storage_dtype ({storage_dtype}) should be 'float32' or 'bfloat16'.")
+        self.storage_dtype = storage_dtype
         self.compression = compression
-        if self.compression == 'gzip':
+        if self.compression == 'gzip' or str(self.compression).startswith('blosc:'):
             self.compression_opts = compression_opts
         else:
             self.compression_opts = None
 
+        if str(self.compression).startswith('blosc:'):
+            import hdf5plugin # Optional dependency, only needed for Blosc compression
+            cname = self.compression.split(':')[1]
+            self.compression_kwargs = dict(hdf5plugin.Blosc(cname=cname, clevel=self.compression_opts,
+                                                            shuffle=hdf5plugin.Blosc.BITSHUFFLE))
+        else:
+            self.compression_kwargs = {'compression': self.compression, 'compression_opts': self.compression_opts}
+
     def get_compute_flags(self):
         return self.compute_flags
 
@@ -65,9 +134,11 @@ class ScalarSaver(RuntimeAction):
             self.num_scalars += 1
 
         self.scalar_saves_per_block = self.steps_per_timeblock//self.steps_between_output
+        # On the device each scalar row is padded to a multiple of 8 floats (32 bytes), so rows start aligned
+        self.padded_saves_per_block = (self.scalar_saves_per_block + 7)//8*8
 
-        # Setup output
-        shape = (self.num_timeblocks, self.scalar_saves_per_block, self.num_scalars)
+        # Setup output. Each scalar is stored contiguously within a timeblock (structure of arrays)
+        shape = (self.num_timeblocks, self.num_scalars, self.scalar_saves_per_block)
         if 'scalar_saver' in output.keys():
             del output['scalar_saver']
         output.create_group('scalar_saver')
@@ -75,167 +146,182 @@ class ScalarSaver(RuntimeAction):
         # Compression has a different syntax depending if is gzip or not because gzip can have also a compression_opts
         # it is possible to use compression=None for not compressing the data
         output.create_dataset('scalar_saver/scalars', shape=shape,
-                chunks=(1, self.scalar_saves_per_block, self.num_scalars),
-                dtype=np.float32, compression=self.compression, compression_opts=self.compression_opts)
+                chunks=(1, 1, self.scalar_saves_per_block), # One chunk per scalar, so columns can be read independently
+                dtype=np.uint16 if self.storage_dtype == 'bfloat16' else np.float32, **self.compression_kwargs)
         output['scalar_saver'].attrs['compression_info'] = f"{self.compression} with opts {self.compression_opts}"
 
         output['scalar_saver'].attrs['steps_between_output'] = self.steps_between_output
         output['scalar_saver'].attrs['scalar_names'] = list(self.sid.keys())
+        output['scalar_saver'].attrs['axes'] = ['timeblock', 'scalar', 'save']
+        output['scalar_saver'].attrs['storage_dtype'] = self.storage_dtype
+        if self.device_resident:
+            output['scalar_saver'].attrs['on_device'] = True # Until written by flush()
 
-        flag = config.CUDA_LOW_OCCUPANCY_WARNINGS
-        config.CUDA_LOW_OCCUPANCY_WARNINGS = False
-        self.zero_kernel = self.make_zero_kernel()
-        config.CUDA_LOW_OCCUPANCY_WARNINGS = flag
+        # Pinned host buffer for faster copies from the device
+        self.h_output_array = cuda.pinned_array((self.num_scalars, self.padded_saves_per_block), dtype=np.float32)
 
-    def make_zero_kernel(self):
+        if self.device_resident:
+            self.d_blocks = cuda.device_array((self.num_timeblocks, self.num_scalars, self.padded_saves_per_block), dtype=np.float32)
+            self.staged_timeblocks = []
 
-        def zero_kernel(array):
-            Nx, Ny = array.shape
-            #i, j = cuda.grid(2) # doing simple 1 thread kernel for now ...
-            for i in range(Nx):
-                for j in range(Ny):
-                    array[i,j] = numba.float32(0.0)
-
-        zero_kernel = cuda.jit(zero_kernel)
-        return zero_kernel[1,1]
-     
     def get_params(self, configuration, compute_plan):
         
-        self.output_array = np.zeros((self.scalar_saves_per_block, self.num_scalars), dtype=np.float32)
-        self.d_output_array = cuda.to_device(self.output_array)
+        # Allocated on the device and zeroed with a memset (all zero bits is 0.0), so no host array is copied
+        self.d_output_array = cuda.device_array((self.num_scalars, self.padded_saves_per_block), dtype=np.float32)
+        device_memset(self.d_output_array, 0, self.d_output_array.nbytes)
         self.params = (self.steps_between_output, self.d_output_array)
         return self.params
     
     def initialize_before_timeblock(self, timeblock: int, output_reference):
-        self.zero_kernel(self.d_output_array)
+        if self.device_resident and timeblock == 0:
+            output_reference['scalar_saver'].attrs['on_device'] = True # New run, until written by flush()
+        device_memset(self.d_output_array, 0, self.d_output_array.nbytes) # Slice assignment would copy the value from the host and synchronize
+        if self.constant_volume and 'Vol' in self.sid:
+            self.d_output_array[self.sid['Vol'], :self.scalar_saves_per_block] = np.float32(self.configuration.get_volume())
 
     def update_at_end_of_timeblock(self,  timeblock: int, output_reference):
-        output_reference['scalar_saver/scalars'][timeblock, :] = self.d_output_array.copy_to_host()
+        if self.device_resident:
+            # Device to device copy, the data is copied to the host by flush()
+            self.d_blocks[timeblock].copy_to_device(self.d_output_array)
+            self.staged_timeblocks.append(timeblock)
+            return
 
-    def get_prestep_kernel(self, configuration, compute_plan, verbose=False):
-        pb, tp, gridsync = [compute_plan[key] for key in ['pb', 'tp', 'gridsync']]
-        if gridsync:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-                return
-            return cuda.jit(device=gridsync)(kernel)
-        else:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-            return kernel
+        self.d_output_array.copy_to_host(self.h_output_array)
+        self.write_timeblock(timeblock, output_reference)
+
+    def finalize_after_run(self, output_reference):
+        if self.device_resident:
+            self.flush(output_reference)
+
+    def flush(self, output_reference):
+        """ Copy the timeblocks kept on the device (device_resident=True) to the host in one transfer, and write them to output """
+        if self.staged_timeblocks:
+            h_blocks = self.d_blocks.copy_to_host()
+            for timeblock in self.staged_timeblocks:
+                output_reference['scalar_saver/scalars'][timeblock, :] = self.to_storage(h_blocks[timeblock, :, :self.scalar_saves_per_block])
+            self.staged_timeblocks = []
+        output_reference['scalar_saver'].attrs['on_device'] = False
+
+    def write_timeblock(self, timeblock: int, output_reference):
+        """ Write the timeblock in the host buffer (h_output_array) to output """
+        output_reference['scalar_saver/scalars'][timeblock, :] = self.to_storage(self.h_output_array[:, :self.scalar_saves_per_block])
+
+    def to_storage(self, data):
+        """ Convert float32 data to the dtype used in the output """
+        if self.storage_dtype == 'bfloat16':
+            return float32_to_bfloat16(data)
+        return data
 
     def get_poststep_kernel(self, configuration, compute_plan):
         # Unpack parameters from configuration and compute_plan
         D, num_part = configuration.D, configuration.N
         pb, tp, gridsync = [compute_plan[key] for key in ['pb', 'tp', 'gridsync']] 
         num_blocks = (num_part - 1) // pb + 1
-        
-        # Below is three alternatives of how to unpack parameters for use in the kernel
-
-#        Alternative 1. Requires renaming of some variables
-#        print(configuration.compute_flags)
-#        for key in configuration.compute_flags.keys():
-#            if key == "stresses" and configuration.compute_flags[key]:
-#                sx_id = configuration.vectors.indices['sx']
-#            elif configuration.compute_flags[key]:
-#                print(key, configuration.compute_flags[key], f'{key}_id', self.sid[key], f'compute_{key}')
-#                globals()[f'compute_{key}'] = configuration.compute_flags[key]
-#                globals()[f'{key}_id'] = self.sid[key]
-#        print(compute_U)
-
-
-        # Alternative 2. 'None' used as index for scalars that are not there, and therefore shouldn't be used (kernel throws an getitem error)  
-        unpacked_compute_flags = [configuration.compute_flags[key] for key in ['U', 'W', 'lapU', 'Fsq', 'K', 'Vol', 'Ptot', 'stresses']]
-        compute_u, compute_w, compute_lap, compute_fsq, compute_k, compute_vol, compute_Ptot, compute_stresses = unpacked_compute_flags
-
-        unpacked_scalar_indicies = [self.sid.get(key, None) for key in ['U', 'W', 'lapU', 'Fsq', 'K', 'Vol', 'Px', 'Py', 'Pz', 'Sxy']]
-        u_id, w_id, lap_id, fsq_id, k_id, vol_id, Px_id, Py_id, Pz_id, Sxy_id = unpacked_scalar_indicies
-
-        # Original
-        #compute_u = configuration.compute_flags['U']
-        #compute_w = configuration.compute_flags['W']
-        #compute_lap = configuration.compute_flags['lapU']
-        #compute_fsq = configuration.compute_flags['Fsq']
-        #compute_k = configuration.compute_flags['K']
-        #compute_vol = configuration.compute_flags['Vol']
-        #compute_Ptot = configuration.compute_flags['Ptot']
-        #compute_stresses = configuration.compute_flags['stresses']
-        
-    
-        # Unpack indices for scalars to be compiled into kernel
-        #if compute_u:
-        #    u_id = self.sid['U']
-
-        #if compute_k:
-        #    k_id = self.sid['K']
-        #if compute_w:
-        #    w_id = self.sid['W']
-
-        #if compute_fsq:
-        #    fsq_id = self.sid['Fsq']
-
-        #if compute_lap:
-        #    lap_id = self.sid['lapU']
-
-        #if compute_vol:
-        #    vol_id = self.sid['Vol']
 
-        #if compute_Ptot:
-        #    Px_id = self.sid['Px']
-        #    Py_id = self.sid['Py']
-        #    Pz_id = self.sid['Pz']
-
-        #if compute_stresses:
-        #    Sxy_id = self.sid['Sxy']
+        # Shared memory arrays needs a size known at compile time, and of at least one element
+        num_scalars = self.num_scalars
+        shared_size = max(num_scalars, 1)
 
         m_id = configuration.sid['m']
-
-
         v_id = configuration.vectors.indices['v']
-        if compute_stresses:
-            sx_id = configuration.vectors.indices['sx']
 
-        volume_function = numba.njit(configuration.simbox.get_volume_function())
-
-        def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_action_params):
-            """     
-            """
-            steps_between_output, output_array = runtime_action_params # Needs to be compatible with get_params above
-            if step%steps_between_output==0:
-                save_index = step//steps_between_output
-            
-                global_id, my_t = cuda.grid(2)
-                if global_id < num_part and my_t == 0:
-                    if compute_u:
-                        cuda.atomic.add(output_array, (save_index, u_id), scalars[global_id][u_id])   # Potential energy
-                    if compute_w:
-                        cuda.atomic.add(output_array, (save_index, w_id), scalars[global_id][w_id])   # Virial
-                    if compute_lap:
-                        cuda.atomic.add(output_array, (save_index, lap_id), scalars[global_id][lap_id]) # Laplace
-                    if compute_fsq:
-                        cuda.atomic.add(output_array, (save_index, fsq_id), scalars[global_id][fsq_id]) # F**2
-                    if compute_k:
-                        cuda.atomic.add(output_array, (save_index, k_id), scalars[global_id][k_id])   # Kinetic energy
-
-                    # Contribution to total momentum
-                    if compute_Ptot or compute_stresses:
-                        my_m = scalars[global_id][m_id]
-                    if compute_Ptot:
-                        cuda.atomic.add(output_array, (save_index, Px_id), my_m*vectors[v_id][global_id][0])
-                        cuda.atomic.add(output_array, (save_index, Py_id), my_m*vectors[v_id][global_id][1])
-                        cuda.atomic.add(output_array, (save_index, Pz_id), my_m*vectors[v_id][global_id][2])
-
-                    if compute_stresses:
-                        # XY component of stress only for now
-                        cuda.atomic.add(output_array, (save_index, Sxy_id), vectors[sx_id][global_id][1] -
-                                        my_m * vectors[v_id][global_id][0]*vectors[v_id][global_id][1])
-
-                if compute_vol and global_id == 0 and my_t == 0:
-                    output_array[save_index][vol_id] = volume_function(sim_box)
+        # The kernel source is generated with lines only for the scalars that are saved,
+        # so the compiled kernel has no branches (or indices) for scalars not computed.
+        # Each term is (index in output, contribution of particle global_id, comment)
+        terms = []
+        descriptions = {'U': 'Potential energy', 'W': 'Virial', 'lapU': 'Laplace', 'Fsq': 'F**2', 'K': 'Kinetic energy'}
+        for key in ['U', 'W', 'lapU', 'Fsq', 'K']:
+            if key in self.sid:
+                terms.append((self.sid[key], f"scalars[global_id][{configuration.sid[key]}]", descriptions[key]))
 
-            return
-        
-        kernel = cuda.jit(device=gridsync)(kernel)
+        if 'Px' in self.sid:
+            for k, key in enumerate(['Px', 'Py', 'Pz']):
+                terms.append((self.sid[key], f"my_m*vectors[{v_id}][global_id][{k}]", 'Contribution to total momentum'))
+
+        if 'Sxy' in self.sid:
+            sx_id = configuration.vectors.indices['sx']
+            terms.append((self.sid['Sxy'], f"vectors[{sx_id}][global_id][1] - my_m * vectors[{v_id}][global_id][0]*vectors[{v_id}][global_id][1]",
+                          'XY component of stress only for now'))
+
+        # Sum over each warp with shuffles, so only one thread per warp does an atomic add to shared memory.
+        # Requires full warps, and is not supported by the cuda simulator.
+        threads_per_block = pb*tp if gridsync else pb
+        use_warp_sum = threads_per_block % 32 == 0 and os.getenv("NUMBA_ENABLE_CUDASIM") != "1"
+
+        contributions = []
+        if use_warp_sum:
+            # All threads in the warp take part in the shuffles, threads without a particle contribute zero
+            contributions.append("my_particle = global_id < num_part and my_t == 0")
+            if 'Px' in self.sid or 'Sxy' in self.sid:
+                contributions.append(f"my_m = scalars[global_id][{m_id}] if my_particle else numba.float32(0.0)")
+            for index, term, comment in terms:
+                contributions.append(f"value = warp_sum({term} if my_particle else numba.float32(0.0)) # {comment}")
+                contributions.append(f"if cuda.laneid == 0: cuda.atomic.add(block_sums, {index}, value)")
+        else:
+            contributions.append("if global_id < num_part and my_t == 0:")
+            if 'Px' in self.sid or 'Sxy' in self.sid:
+                contributions.append(f"    my_m = scalars[global_id][{m_id}]")
+            for index, term, comment in terms:
+                contributions.append(f"    cuda.atomic.add(block_sums, {index}, {term}) # {comment}")
+            if not terms:
+                contributions.append("    pass")
+
+        # Volume is only set in the first block, all other blocks contribute zero.
+        # With a constant volume it is instead set from the host before the timeblock, see initialize_before_timeblock
+        volume = ""
+        if 'Vol' in self.sid and not self.constant_volume:
+            volume = f"if global_id == 0 and my_t == 0: block_sums[{self.sid['Vol']}] = volume_function(sim_box)"
+
+        contributions = "\n        ".join(contributions)
+        kernel_source = f"""
+def kernel(grid, vectors, scalars, r_im, sim_box, step, runtime_action_params):
+    \"\"\" Two stage reduction: Each block sums its particles contributions in shared memory (optionally summing over warps first),
+    then the block sums are added to the output_array in global memory, one scalar per thread.
+    \"\"\"
+    steps_between_output, output_array = runtime_action_params # Needs to be compatible with get_params above
+    if step%steps_between_output==0:
+        save_index = step//steps_between_output
+
+        block_sums = cuda.shared.array(shape=(shared_size,), dtype=numba.float32)
+        global_id, my_t = cuda.grid(2)
+        my_block_thread = cuda.threadIdx.x
+        if my_block_thread == 0 and my_t == 0:
+            for i in range(num_scalars):
+                block_sums[i] = numba.float32(0.0)
+        cuda.syncthreads()
+
+        {contributions}
+
+        {volume}
+        cuda.syncthreads()
+
+        if my_t == 0:
+            for i in range(my_block_thread, num_scalars, pb):
+                cuda.atomic.add(output_array, (i, save_index), block_sums[i])
+
+    return
+"""
+        # A kernel launched from python is compiled eagerly with an explicit signature (the types of the device arrays
+        # used by Simulation). The device function used with gridsync is typed when the integrator kernel is compiled.
+        signature = None
+        if not gridsync:
+            array_type = lambda array: numba.types.Array(numba.from_dtype(array.dtype), array.ndim, 'C')
+            signature = numba.void(numba.int64, array_type(configuration.vectors.array), array_type(configuration.scalars),
+                                   array_type(configuration.r_im), array_type(configuration.simbox.data_array), numba.int64,
+                                   numba.types.Tuple((numba.int64, numba.types.Array(numba.float32, 2, 'C'))))
+
+        # The key holds everything the kernel depends on: the source, and the values injected in its namespace below
+        # (num_scalars is not given by the source, e.g. a volume set from the host has no line in it)
+        key = (kernel_source, D, num_part, num_scalars, shared_size, pb, gridsync, type(configuration.simbox), signature)
+        if key not in ScalarSaver.kernel_cache:
+            namespace = {'cuda': cuda, 'numba': numba, 'warp_sum': warp_sum, 'num_part': num_part, 'num_scalars': num_scalars, 'pb': pb,
+                         'shared_size': shared_size, 'volume_function': numba.njit(configuration.simbox.get_volume_function())}
+            exec(compile(kernel_source, '<ScalarSaver poststep kernel>', 'exec'), namespace)
+            if signature is None:
+                ScalarSaver.kernel_cache[key] = cuda.jit(device=gridsync)(namespace['kernel'])
+            else:
+                ScalarSaver.kernel_cache[key] = cuda.jit(signature)(namespace['kernel'])
+        kernel = ScalarSaver.kernel_cache[key]
 
         if gridsync:
             return kernel  # return device function
@@ -248,24 +334,47 @@ class ScalarSaver(RuntimeAction):
         h5grp = h5file['scalar_saver']
         str = f"\tscalar_names: {h5grp.attrs['scalar_names']}"
         str += f"\n\tscalars, shape: {h5grp['scalars'].shape}, dtype: {h5grp['scalars'].dtype}"
+        if 'storage_dtype' in h5grp.attrs:
+            str += f" (storage_dtype: {h5grp.attrs['storage_dtype']})"
         return str
 
     def columns(h5file):
         return list(h5file['scalar_saver'].attrs['scalar_names'])
 
+    def read_columns(h5file, indices, first_block=0, last_block=None):
+        """ Read scalar columns with the given indices.
+        Returns an array with shape (num_timeblocks, len(indices), scalar_saves_per_block)
+        """
+        h5grp = h5file['scalar_saver']
+        if h5grp.attrs.get('on_device', False):
+            raise ValueError('The scalars are kept on the device (ScalarSaver with device_resident=True) until the end of the run, '
+                             'and can not be read on-the-fly.')
+        if str(h5grp.attrs.get('compression_info', '')).startswith('blosc:'):
+            import hdf5plugin # Registers the Blosc filter with h5py
+        unique_indices = sorted(set(indices)) # h5py requires increasing indices for reading several columns at once
+        if 'axes' in h5grp.attrs:
+            data = h5grp['scalars'][first_block:last_block, unique_indices, :]
+        else:
+            # Files written before the scalar-major layout was introduced
+            data = h5grp['scalars'][first_block:last_block, :, unique_indices].transpose(0, 2, 1)
+        data = data[:, [unique_indices.index(index) for index in indices], :]
+        if h5grp.attrs.get('storage_dtype', 'float32') == 'bfloat16':
+            data = bfloat16_to_float32(data)
+        return data
+
     def extract(h5file, columns, per_particle=True, first_block=0, last_block=None, subsample=1, function=None):
         _, N, D = h5file['initial_configuration']['vectors'].shape
 
         h5grp = h5file['scalar_saver']
         scalar_names = list(h5grp.attrs['scalar_names'])
+        indices = [scalar_names.index(column) for column in columns]
+        data_array = ScalarSaver.read_columns(h5file, indices, first_block, last_block)
+        scale = np.float32(N) if per_particle else np.float32(1.0)
+        time_series = columns_to_time_series(data_array, subsample, scale)
 
         output = []
-        for column in columns: 
-            index = scalar_names.index(column)
-            data = np.ravel(h5grp['scalars'][first_block:last_block,:,index])[::subsample]
-            if per_particle:
-                data /= N
-
+        for i in range(len(columns)):
+            data = time_series[i]
             if function:
                 data = function(data)
         
@@ -273,6 +382,8 @@ class ScalarSaver(RuntimeAction):
         return output
         
     def get_times(h5file, first_block=0, last_block=None, reset_time=True, subsample=1):
-        num_timeblock, saves_per_timeblock = h5file['scalar_saver']['scalars'][first_block:last_block,:,0].shape
+        h5grp = h5file['scalar_saver']
+        num_timeblock = len(range(h5grp['scalars'].shape[0])[first_block:last_block])
+        saves_per_timeblock = h5grp['scalars'].shape[2] if 'axes' in h5grp.attrs else h5grp['scalars'].shape[1]
         times_array = np.arange(0,num_timeblock*saves_per_timeblock, step=subsample)*h5file.attrs['dt']
         return times_array
@@ -138,18 +138,6 @@ class StressSaver(RuntimeAction):
             return kernel[num_blocks, (pb, 1)]  # return kernel, incl. launch parameters
 
     #### CONSIDER USING POSTSTEP TO GET CORRECT VELOCITIES ###############
-    def get_poststep_kernel(self, configuration, compute_plan, verbose=False):
-        pb, tp, gridsync = [compute_plan[key] for key in ['pb', 'tp', 'gridsync']]
-        if gridsync:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-                return
-            return cuda.jit(device=gridsync)(kernel)
-        else:
-            def kernel(grid, vectors, scalars, r_im, sim_box, step, conf_saver_params):
-                pass
-            return kernel
-
     # Class functions to read data
 
     def extract(h5file, first_block=0, last_block=None, subsample=1):
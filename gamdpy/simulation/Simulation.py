@@ -398,39 +398,44 @@ class Simulation():
 
         zero = np.float32(0.0)
 
-        for block in range(num_timeblocks):
+        try:
+            for block in range(num_timeblocks):
 
-            self.current_block = block
-            for runtime_action in self.runtime_actions:
-                runtime_action.initialize_before_timeblock(block, self.get_output(mode="a"))
-            
-            if self.timing: 
-                start_block.record()
+                self.current_block = block
+                for runtime_action in self.runtime_actions:
+                    runtime_action.initialize_before_timeblock(block, self.get_output(mode="a"))
 
-            self.integrate_self(np.float32(block * self.steps_per_block * self.dt),self.steps_per_block)
+                if self.timing:
+                    start_block.record()
 
-            if self.timing:
-                end_block.record()
-                end_block.synchronize()
-                block_times.append(cuda.event_elapsed_time(start_block, end_block))
+                self.integrate_self(np.float32(block * self.steps_per_block * self.dt),self.steps_per_block)
 
-            self.configuration.copy_to_host()
+                if self.timing:
+                    end_block.record()
+                    end_block.synchronize()
+                    block_times.append(cuda.event_elapsed_time(start_block, end_block))
 
-            for interaction in self.interactions:
-                interaction.check_datastructure_validity()
+                self.configuration.copy_to_host()
 
-            for runtime_action in self.runtime_actions:
-                runtime_action.update_at_end_of_timeblock(block, self.get_output(mode="a"))
+                for interaction in self.interactions:
+                    interaction.check_datastructure_validity()
 
-            #if self.storage:
-            #    self.configuration.save(output=self.get_output(mode="a"), group_name=f"/restarts/restart{block:04d}", mode="w", include_topology=True)
+                for runtime_action in self.runtime_actions:
+                    runtime_action.update_at_end_of_timeblock(block, self.get_output(mode="a"))
 
-            if self.storage and self.storage[-3:] == '.h5':
-                self.output.close()
+                #if self.storage:
+                #    self.configuration.save(output=self.get_output(mode="a"), group_name=f"/restarts/restart{block:04d}", mode="w", include_topology=True)
 
-            yield block
+                if self.storage and self.storage[-3:] == '.h5':
+                    self.output.close()
+
+                yield block
+
+        finally:
+            # Finalizing run, also if the loop over the generator is left early (break or exception)
+            for runtime_action in self.runtime_actions:
+                runtime_action.finalize_after_run(self.get_output(mode="a"))
 
-        # Finalizing run
         if self.timing:
             end.record()
             end.synchronize()
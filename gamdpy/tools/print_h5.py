@@ -21,7 +21,7 @@ def print_h5_structure(node, indent=0):
             molecules/ (Group)
         vectors  (Dataset, shape=(3, 2048, 3), dtype=float32)
     scalar_saver/ (Group)
-        scalars  (Dataset, shape=(8, 64, 3), dtype=float32)
+        scalars  (Dataset, shape=(8, 3, 64), dtype=float32)
     trajectory_saver/ (Group)
         images  (Dataset, shape=(8, 12, 2048, 3), dtype=int32)
         positions  (Dataset, shape=(8, 12, 2048, 3), dtype=float32)
@@ -62,9 +62,11 @@ def print_h5_attributes(obj, path="/"):
     Attributes at /initial_configuration/vectors:
         - vector_columns: ['r' 'v' 'f']
     Attributes at /scalar_saver/:
+        - axes: ['timeblock' 'scalar' 'save']
         - compression_info: gzip with opts 4
         - scalar_names: ['U' 'W' 'K']
         - steps_between_output: 16
+        - storage_dtype: float32
     Attributes at /trajectory_saver/:
         - compression_info: gzip with opts 4
         - num_timeblocks: 8
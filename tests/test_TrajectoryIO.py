@@ -37,7 +37,6 @@ def test_TrajectoryIO():
 
     # Run simulation
     sim.run(verbose=False)
-    sim.run(verbose=False)
 
     ## Save output to .h5 file
     output = gp.tools.TrajectoryIO()
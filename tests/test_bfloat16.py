@@ -0,0 +1,21 @@
+import numpy as np
+from gamdpy.runtime_actions.scalar_saver import float32_to_bfloat16, bfloat16_to_float32
+
+def test_bfloat16():
+    # Values representable in bfloat16 are converted exactly, including inf and nan
+    exact = np.array([0.0, -0.0, 1.0, -2.5, 1024.0, np.inf, -np.inf], dtype=np.float32)
+    assert np.all(bfloat16_to_float32(float32_to_bfloat16(exact)) == exact)
+    assert np.isnan(bfloat16_to_float32(float32_to_bfloat16(np.array([np.nan], dtype=np.float32))))
+
+    # Rounding to nearest, ties to even
+    assert bfloat16_to_float32(float32_to_bfloat16(np.float32(1.0 + 2**-8))) == np.float32(1.0)
+    assert bfloat16_to_float32(float32_to_bfloat16(np.float32(1.0 + 3*2**-8))) == np.float32(1.0 + 2**-6)
+
+    # Relative error at most 2**-8 (7 bits in the mantissa)
+    x = np.random.uniform(-1000.0, 1000.0, size=(4, 3, 64)).astype(np.float32)
+    y = bfloat16_to_float32(float32_to_bfloat16(x))
+    assert y.shape == x.shape and y.dtype == np.float32
+    assert np.all(np.abs(y - x) <= np.abs(x)*2**-8)
+
+if __name__ == "__main__":  # pragma: no cover
+    test_bfloat16()
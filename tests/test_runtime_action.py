@@ -0,0 +1,61 @@
+""" Test merging of runtime_action kernels (without gridsync, i.e. python functions calling kernels) """
+
+import gamdpy as gp
+from gamdpy.runtime_actions.runtime_action import merge_kernels
+
+def make_kernel(name, calls):
+    def kernel(grid, vectors, scalars, r_im, sim_box, step, params):
+        calls.append((name, params))
+    return kernel
+
+class Action(gp.RuntimeAction):
+    """ Runtime action recording calls of its kernels, which are None unless given """
+    def __init__(self, name, calls, prestep=False, poststep=False):
+        self.name, self.calls, self.prestep, self.poststep = name, calls, prestep, poststep
+
+    def get_params(self, configuration, compute_plan):
+        return (self.name, )
+
+    def get_prestep_kernel(self, configuration, compute_plan):
+        return make_kernel(self.name + '_pre', self.calls) if self.prestep else None
+
+    def get_poststep_kernel(self, configuration, compute_plan):
+        return make_kernel(self.name + '_post', self.calls) if self.poststep else None
+
+def test_merge_kernels():
+    calls = []
+    assert merge_kernels(None, None, gridsync=False) is None
+
+    merge_kernels(None, make_kernel('B', calls), gridsync=False)(0, 0, 0, 0, 0, 0, ('paramsA', 'paramsB'))
+    assert calls == [('B', 'paramsB')]
+
+    calls.clear()
+    merge_kernels(make_kernel('A', calls), None, gridsync=False)(0, 0, 0, 0, 0, 0, ('paramsA', 'paramsB'))
+    assert calls == [('A', 'paramsA')]
+
+    calls.clear()
+    merge_kernels(make_kernel('A', calls), make_kernel('B', calls), gridsync=False)(0, 0, 0, 0, 0, 0, ('paramsA', 'paramsB'))
+    assert calls == [('A', 'paramsA'), ('B', 'paramsB')]
+
+def test_add_runtime_actions_list():
+    compute_plan = {'gridsync': False}
+
+    # No kernels at all
+    calls = []
+    prestep, poststep, params = gp.add_runtime_actions_list(None, [Action('a', calls), Action('b', calls)], compute_plan)
+    assert prestep is None and poststep is None
+    assert params == (('a',), ('b',))
+
+    # Params are nested as ((params_a, params_b), params_c)
+    actions = [Action('a', calls, poststep=True), Action('b', calls, prestep=True), Action('c', calls, poststep=True)]
+    prestep, poststep, params = gp.add_runtime_actions_list(None, actions, compute_plan)
+    assert params == ((('a',), ('b',)), ('c',))
+    prestep(0, 0, 0, 0, 0, 0, params)
+    assert calls == [('b_pre', ('b',))]
+    calls.clear()
+    poststep(0, 0, 0, 0, 0, 0, params)
+    assert calls == [('a_post', ('a',)), ('c_post', ('c',))]
+
+if __name__ == '__main__':
+    test_merge_kernels()
+    test_add_runtime_actions_list()
@@ -0,0 +1,158 @@
+""" Test the ScalarSaver runtime action """
+
+import numpy as np
+import gamdpy as gp
+
+def make_sim(compute_flags=None, num_timeblocks=3, **scalar_saver_kwargs):
+    """ A small LJ simulation saving scalars every 4 steps """
+    configuration = gp.Configuration(D=3, compute_flags=compute_flags)
+    configuration.make_lattice(gp.unit_cells.FCC, cells=[4, 4, 2], rho=0.8442)
+    configuration['m'] = 1.0
+    configuration.randomize_velocities(temperature=1.44, seed=1)
+    pair_func = gp.apply_shifted_force_cutoff(gp.LJ_12_6_sigma_epsilon)
+    pair_pot = gp.PairPotential(pair_func, params=[1.0, 1.0, 2.5], max_num_nbs=1000)
+    integrator = gp.integrators.NVE(dt=0.005)
+    runtime_actions = [gp.ScalarSaver(4, **scalar_saver_kwargs)]
+    return gp.Simulation(configuration, pair_pot, integrator, runtime_actions,
+                         num_timeblocks=num_timeblocks, steps_per_timeblock=16, storage='memory', timing=False)
+
+def make_sim_and_run(**kwargs):
+    sim = make_sim(**kwargs)
+    sim.run(verbose=False)
+    return sim.output
+
+def test_kernel_cache_constant_volume():
+    # With constant_volume the kernel source has no line for Vol, so it matches the source without Vol.
+    # The cached kernel must not be reused, since it adds a different number of scalars to the output
+    sim = make_sim(compute_flags={'Vol': True}, constant_volume=True)
+    sim.run(verbose=False)
+    sim = make_sim()
+    sim.run(verbose=False)
+    U, K = gp.ScalarSaver.extract(sim.output, ['U', 'K'])
+    assert np.all(np.isfinite(U)) and np.all(K > 0)
+
+def test_constant_volume():
+    # The volume set from the host is the same as computed on the device
+    Vol_reference, U_reference = gp.ScalarSaver.extract(make_sim_and_run(compute_flags={'Vol': True}), ['Vol', 'U'], per_particle=False)
+    Vol, U = gp.ScalarSaver.extract(make_sim_and_run(compute_flags={'Vol': True}, constant_volume=True), ['Vol', 'U'], per_particle=False)
+    assert np.allclose(Vol, Vol_reference, rtol=1e-6) and np.all(Vol > 0)
+    assert np.allclose(U, U_reference, rtol=1e-5)
+
+def test_read_on_the_fly():
+    # The scalars of a timeblock are written before the timeblock is yielded
+    sim = make_sim()
+    on_the_fly = []
+    for block in sim.run_timeblocks():
+        U, = gp.ScalarSaver.extract(sim.output, ['U'], first_block=block, last_block=block+1)
+        on_the_fly.append(U)
+    U, = gp.ScalarSaver.extract(sim.output, ['U'])
+    assert np.all(np.concatenate(on_the_fly) == U)
+    assert np.all(U != 0.0)
+
+def test_device_resident():
+    # Scalars are summed with atomics in no particular order, so they are only equal to within rounding
+    import pytest
+    U_reference, K_reference = gp.ScalarSaver.extract(make_sim_and_run(), ['U', 'K'])
+
+    # Timeblocks run before leaving the loop early are written to the output
+    sim = make_sim(device_resident=True)
+    for block in sim.run_timeblocks():
+        with pytest.raises(ValueError):
+            gp.ScalarSaver.extract(sim.output, ['U'], first_block=block, last_block=block+1)
+        if block == 1:
+            break
+    U, K = gp.ScalarSaver.extract(sim.output, ['U', 'K'], last_block=2)
+    assert np.allclose(U, U_reference[:len(U)], rtol=1e-5) and np.allclose(K, K_reference[:len(K)], rtol=1e-5)
+
+    # Also in a second run of the same simulation, where the output holds the data of the first run
+    sim.run(verbose=False)
+    for block in sim.run_timeblocks():
+        with pytest.raises(ValueError):
+            gp.ScalarSaver.extract(sim.output, ['U'], first_block=block, last_block=block+1)
+    U, K = gp.ScalarSaver.extract(sim.output, ['U', 'K'])
+    assert np.all(np.isfinite(U)) and np.all(K > 0)
+
+    U, K = gp.ScalarSaver.extract(make_sim_and_run(device_resident=True), ['U', 'K'])
+    assert np.allclose(U, U_reference, rtol=1e-5) and np.allclose(K, K_reference, rtol=1e-5)
+
+def test_read_layouts():
+    # Reading files written with the current (timeblock, scalar, save) layout, and the old (timeblock, save, scalar) layout
+    import h5py
+    num_timeblocks, num_scalars, saves_per_block, N = 4, 3, 5, 10
+    data = np.arange(num_timeblocks*num_scalars*saves_per_block, dtype=np.float32).reshape(num_timeblocks, num_scalars, saves_per_block)
+    for old_layout in [False, True]:
+        h5file = h5py.File('scalars.h5', 'w', driver='core', backing_store=False)
+        h5file.attrs['dt'] = 0.005
+        h5file.create_dataset('initial_configuration/vectors', data=np.zeros((3, N, 3), dtype=np.float32))
+        h5file.create_group('scalar_saver')
+        h5file['scalar_saver'].attrs['scalar_names'] = ['U', 'W', 'K']
+        h5file['scalar_saver'].attrs['steps_between_output'] = 4
+        if old_layout:
+            h5file.create_dataset('scalar_saver/scalars', data=data.transpose(0, 2, 1))
+        else:
+            h5file.create_dataset('scalar_saver/scalars', data=data)
+            h5file['scalar_saver'].attrs['axes'] = ['timeblock', 'scalar', 'save']
+
+        # Unsorted and duplicate indices
+        indices = [2, 0, 2]
+        assert np.all(gp.ScalarSaver.read_columns(h5file, indices) == data[:, indices, :])
+        assert np.all(gp.ScalarSaver.read_columns(h5file, indices, first_block=1, last_block=3) == data[1:3, indices, :])
+
+        K, U, K2 = gp.ScalarSaver.extract(h5file, ['K', 'U', 'K'], first_block=1, subsample=2)
+        assert np.all(U == data[1:, 0, :].flatten()[::2]/N)
+        assert np.all(K == data[1:, 2, :].flatten()[::2]/N) and np.all(K2 == K)
+        W, = gp.ScalarSaver.extract(h5file, ['W'], per_particle=False, last_block=2)
+        assert np.all(W == data[:2, 1, :].flatten())
+
+        times = gp.ScalarSaver.get_times(h5file, first_block=1, subsample=2)
+        assert np.allclose(times, np.arange(0, (num_timeblocks-1)*saves_per_block, 2)*0.005)
+        assert len(times) == len(U)
+        h5file.close()
+
+def write_and_extract(**scalar_saver_kwargs):
+    """ Write two timeblocks of known scalars through a ScalarSaver (without running a simulation), and extract them """
+    import h5py
+    configuration = gp.Configuration(D=3)
+    configuration.make_lattice(gp.unit_cells.FCC, cells=[4, 4, 2], rho=0.8442)
+    output = h5py.File('scalars.h5', 'w', driver='core', backing_store=False)
+    configuration.save(output=output, group_name='initial_configuration', mode='w')
+    scalar_saver = gp.ScalarSaver(4, **scalar_saver_kwargs)
+    scalar_saver.setup(configuration, num_timeblocks=2, steps_per_timeblock=16, output=output)
+    num_scalars, saves_per_block = scalar_saver.num_scalars, scalar_saver.scalar_saves_per_block
+    data = np.random.uniform(-1000.0, 1000.0, size=(2, num_scalars, saves_per_block)).astype(np.float32)
+    for timeblock in range(2):
+        scalar_saver.h_output_array[:, :saves_per_block] = data[timeblock]
+        scalar_saver.write_timeblock(timeblock, output)
+    columns = gp.ScalarSaver.columns(output)
+    extracted = gp.ScalarSaver.extract(output, columns, per_particle=False)
+    expected = [data[:, i, :].flatten() for i in range(len(columns))]
+    return output, extracted, expected
+
+def test_blosc():
+    import pytest
+    hdf5plugin = pytest.importorskip('hdf5plugin')
+    output, extracted, expected = write_and_extract(compression='blosc:lz4', compression_opts=5)
+    assert output['scalar_saver'].attrs['compression_info'] == 'blosc:lz4 with opts 5'
+    assert output['scalar_saver/scalars'].id.get_create_plist().get_filter(0)[0] == hdf5plugin.BLOSC_ID
+    for column, expected_column in zip(extracted, expected):
+        assert np.all(column == expected_column)
+
+def test_bfloat16_storage():
+    output, extracted, expected = write_and_extract(storage_dtype='bfloat16')
+    assert output['scalar_saver/scalars'].dtype == np.uint16
+    assert output['scalar_saver'].attrs['storage_dtype'] == 'bfloat16'
+    data = gp.ScalarSaver.read_columns(output, [1, 0])
+    assert data.dtype == np.float32 and data.shape == (2, 2, 4)
+    for column, expected_column in zip(extracted, expected):
+        assert column.dtype == np.float32
+        assert np.all(np.abs(column - expected_column) <= np.abs(expected_column)*2**-8)
+        assert not np.all(column == expected_column) # Rounded to bfloat16
+
+if __name__ == '__main__':
+    test_kernel_cache_constant_volume()
+    test_constant_volume()
+    test_read_on_the_fly()
+    test_device_resident()
+    test_read_layouts()
+    test_blosc()
+    test_bfloat16_storage()